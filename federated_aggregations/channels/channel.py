@@ -3,6 +3,7 @@ import asyncio
 import itertools
 from typing import Tuple
 
+import numpy as np
 import tensorflow_federated as tff
 from tensorflow_federated.python.common_libs import py_typecheck
 from tensorflow_federated.python.common_libs import structure
@@ -16,6 +17,13 @@ from federated_aggregations import utils
 from federated_aggregations.channels import computations as sodium_comp
 from federated_aggregations.channels import key_store
 
+# Sealing & opening computations depend only on their argument types and
+# dtype, so their traced specs are shared by every EasyBoxChannel.
+_ENCRYPTOR_CACHE = {}
+_BATCH_ENCRYPTOR_CACHE = {}
+_DECRYPTOR_CACHE = {}
+_BATCH_DECRYPTOR_CACHE = {}
+
 PlacementPair = Tuple[
     placement_literals.PlacementLiteral,
     placement_literals.PlacementLiteral]
@@ -46,7 +54,8 @@ class BaseChannel(Channel):
   implementations of the Channel abstraction. For any subclass ConcreteChannel,
   FederatingStrategy should only use the ConcreteChannel.transfer method.
   Implementations of the Channel interface need only be concerned with
-  extending Channel.send, Channel.receive, and Channel.setup.
+  extending Channel.send, Channel.receive, and Channel.setup. They may also
+  override BaseChannel.send_each to pipeline transfers from CLIENTS.
 
   Attributes:
     strategy: The FederatingStrategy this Channel belongs to.
@@ -65,8 +74,16 @@ class BaseChannel(Channel):
     sender_placement = value.type_signature.placement
     receiver_placement = _get_other_placement(
         sender_placement, self.placements)
-    sent = await self.send(value, sender_placement, receiver_placement)
     rcv_children = self.strategy._get_child_executors(receiver_placement)
+    if (sender_placement is tff.CLIENTS and
+        receiver_placement is not tff.CLIENTS):
+      message_value = await _forward_to_singleton(
+          self.send_each(value, sender_placement, receiver_placement),
+          rcv_children[0], receiver_placement,
+          value.type_signature.all_equal)
+      return await self.receive(
+          message_value, sender_placement, receiver_placement)
+    sent = await self.send(value, sender_placement, receiver_placement)
     message = await sent.compute()
     message_type = type_conversions.infer_type(message)
     if receiver_placement is tff.CLIENTS:
@@ -101,6 +118,21 @@ class BaseChannel(Channel):
               value.type_signature.all_equal))
     return await self.receive(message_value, sender_placement, receiver_placement)
 
+  def send_each(self, value, source, recipient):
+    """Sends a CLIENTS-placed value, returning one awaitable per client.
+
+    Each awaitable resolves to the sent member value of one client. transfer
+    uses this to forward every client's message as soon as it is ready. By
+    default all members wait on a single call to send; subclasses can
+    override this so each client's send completes independently.
+    """
+    sent = asyncio.ensure_future(self.send(value, source, recipient))
+
+    async def sent_member(index):
+      return (await sent).internal_representation[index]
+
+    return [sent_member(i) for i in range(len(value.internal_representation))]
+
 
 class PlaintextChannel(BaseChannel):
   """An insecure Channel implementation that communicates tensors in plaintext.
@@ -130,7 +162,7 @@ class EasyBoxChannel(BaseChannel):
   It also defines the pre- and post-processing steps required to achieve
   encryption-in-transit under the native runtime's communication model.
 
-  TODO: surface _key_generator to avoid keygen/exchange, and instead accept
+  TODO: surface _keygen_spec to avoid keygen/exchange, and instead accept
         keys from a trusted PKI.
 
   Reference for encryption scheme:
@@ -150,16 +182,31 @@ class EasyBoxChannel(BaseChannel):
     super().__init__(strategy, *placements)
     self.key_references = key_store.KeyStore()
     self._requires_setup = True
-    self._key_generator = None  # lazy key generation
-    self._encryptor_cache = {}
-    self._decryptor_cache = {}
+    self._keygen_spec = None  # lazy key generation
+    self._message_counter = 0  # seeds per-message nonces
 
   async def send(self, value, sender_placement, receiver_placement):
+    message_counter = self._next_message_counter()
     if sender_placement is tff.CLIENTS:
-      return await self._encrypt_values_on_clients(value, sender_placement,
-          receiver_placement)
+      encrypted_values, encrypted_type = self._encrypt_values_on_clients(
+          value, sender_placement, receiver_placement, message_counter)
+      return federated_resolving_strategy.FederatedResolvingStrategyValue(
+          await asyncio.gather(*encrypted_values), encrypted_type)
     return await self._encrypt_values_on_singleton(value, sender_placement,
-        receiver_placement)
+        receiver_placement, message_counter)
+
+  def send_each(self, value, sender_placement, receiver_placement):
+    if sender_placement is not tff.CLIENTS:
+      return super().send_each(value, sender_placement, receiver_placement)
+    encrypted_values, _ = self._encrypt_values_on_clients(value,
+        sender_placement, receiver_placement, self._next_message_counter())
+    return encrypted_values
+
+  def _next_message_counter(self):
+    # Both directions share the same key pairs, so the counter is shared too.
+    message_counter = self._message_counter
+    self._message_counter += 1
+    return message_counter
 
   async def receive(self, value, sender_placement, receiver_placement):
     if receiver_placement is tff.CLIENTS:
@@ -171,28 +218,41 @@ class EasyBoxChannel(BaseChannel):
   async def setup(self):
     if self._requires_setup:
       p0, p1 = self.placements
-      await asyncio.gather(*[
-          self._generate_keys(p0),
-          self._generate_keys(p1)])
-      await asyncio.gather(*[
-          self._share_public_key(p0, p1),
-          self._share_public_key(p1, p0)])
+      keygens = {
+          p: asyncio.ensure_future(self._generate_keys(p)) for p in (p0, p1)}
+
+      # Each direction shares its owner's public key as soon as that owner's
+      # keys exist, without waiting on the other placement's keygen.
+      async def share_after_keygen(key_owner, key_receiver):
+        await keygens[key_owner]
+        await self._share_public_key(key_owner, key_receiver)
+
+      # The keygen tasks are gathered too, so a failure in any step cancels
+      # the rest and no task's exception goes unretrieved.
+      await utils.gather_or_cancel(
+          *keygens.values(),
+          share_after_keygen(p0, p1),
+          share_after_keygen(p1, p0))
       self._requires_setup = False
 
-  async def _encrypt_values_on_singleton(self, val, sender, receiver):
+  async def _encrypt_values_on_singleton(self, val, sender, receiver,
+      message_counter):
+    if receiver is not tff.CLIENTS:
+      return await self._encrypt_value_for_singleton(val, sender, receiver,
+          message_counter)
     ###
     # we can safely assume  sender has cardinality=1 when receiver is CLIENTS
     ###
     # Case 1: receiver=CLIENTS
     #     plaintext: Fed(Tensor, sender, all_equal=True)
-    #     pk_receiver: Fed(Tuple(Tensor), sender, all_equal=True)
+    #     pk_receiver: Fed(Tensor[n, ...], sender, all_equal=True)
     #     sk_sender: Fed(Tensor, sender, all_equal=True)
     #   Returns:
     #     encrypted_values: Tuple(Fed(Tensor, sender, all_equal=True))
     ###
     ### Check proper key placement
     sk_sender = self.key_references.get_secret_key(sender)
-    pk_receiver = self.key_references.get_public_key(receiver)
+    pk_receiver = self.key_references.get_stacked_public_keys(receiver)
     type_analysis.check_federated_type(sk_sender.type_signature, placement=sender)
     assert sk_sender.type_signature.placement is sender
     assert pk_receiver.type_signature.placement is sender
@@ -205,43 +265,105 @@ class EasyBoxChannel(BaseChannel):
     type_analysis.check_federated_type(val.type_signature, placement=sender)
     py_typecheck.check_len(val.internal_representation, 1)
     py_typecheck.check_type(pk_receiver.type_signature.member,
-        tff.StructType)
-    py_typecheck.check_len(pk_receiver.internal_representation,
-        len(rcv_children))
+        tff.TensorType)
+    py_typecheck.check_len(pk_receiver.internal_representation, 1)
+    if pk_receiver.type_signature.member.shape[0] != len(rcv_children):
+      raise ValueError(
+          'Expected {} stacked public keys for placement {}, found {}.'.format(
+              len(rcv_children), receiver,
+              pk_receiver.type_signature.member.shape[0]))
     py_typecheck.check_len(sk_sender.internal_representation, 1)
     ### Materialize encryptor function definition & type spec
     input_type = val.type_signature.member
     self._input_type_cache = input_type
     pk_rcv_type = pk_receiver.type_signature.member
     sk_snd_type = sk_sender.type_signature.member
-    pk_element_type = pk_rcv_type[0]
-    encryptor_arg_spec = (input_type, pk_element_type, sk_snd_type)
+    encryptor_arg_spec = (input_type, pk_rcv_type, sk_snd_type)
     encryptor_proto, encryptor_type = utils.materialize_computation_from_cache(
-        sodium_comp.make_encryptor, self._encryptor_cache, encryptor_arg_spec)
+        sodium_comp.make_batch_encryptor, _BATCH_ENCRYPTOR_CACHE,
+        encryptor_arg_spec)
     ### Prepare encryption arguments
     v = val.internal_representation[0]
+    pk = pk_receiver.internal_representation[0]
     sk = sk_sender.internal_representation[0]
-    ### Encrypt values and return them
-    encryptor_fn = await snd_child.create_value(encryptor_proto, encryptor_type)
-    encryptor_args = await asyncio.gather(*[
-        snd_child.create_struct([v, this_pk, sk])
-        for this_pk in pk_receiver.internal_representation])
+    ### Encrypt values for all receivers in one call and return them
+    encryptor_fn, nonce_seed = await asyncio.gather(
+        snd_child.create_value(encryptor_proto, encryptor_type),
+        snd_child.create_value(_nonce_seed(message_counter, 0),
+            sodium_comp.NONCE_SEED_TYPE))
+    encryptor_arg = await snd_child.create_struct([v, pk, sk, nonce_seed])
+    encrypted_batch = await snd_child.create_call(encryptor_fn, encryptor_arg)
     encrypted_values = await asyncio.gather(*[
-        snd_child.create_call(encryptor_fn, arg) for arg in encryptor_args])
-    encrypted_value_types = [encryptor_type.result] * len(encrypted_values)
+        snd_child.create_selection(encrypted_batch, i)
+        for i in range(len(rcv_children))])
     return federated_resolving_strategy.FederatedResolvingStrategyValue(
         structure.from_container(encrypted_values),
         tff.StructType([tff.FederatedType(evt, sender, all_equal=False)
-            for evt in encrypted_value_types]))
+            for evt in encryptor_type.result]))
 
-  async def _encrypt_values_on_clients(self, val, sender, receiver):
+  async def _encrypt_value_for_singleton(self, val, sender, receiver,
+      message_counter):
+    ###
+    # Case 3: sender and receiver are both singletons
+    #     plaintext: Fed(Tensor, sender, all_equal=True)
+    #     pk_receiver: Fed(Tensor, sender, all_equal=True)
+    #     sk_sender: Fed(Tensor, sender, all_equal=True)
+    #   Returns:
+    #     encrypted_values: Tuple(Fed(Tensor, sender, all_equal=False))
+    ###
+    ### Check proper key placement
+    sk_sender = self.key_references.get_secret_key(sender)
+    pk_receiver = self.key_references.get_public_key(receiver)
+    type_analysis.check_federated_type(sk_sender.type_signature, placement=sender)
+    assert sk_sender.type_signature.placement is sender
+    assert pk_receiver.type_signature.placement is sender
+    ### Check placement cardinalities
+    snd_children = self.strategy._get_child_executors(sender)
+    rcv_children = self.strategy._get_child_executors(receiver)
+    py_typecheck.check_len(snd_children, 1)
+    py_typecheck.check_len(rcv_children, 1)
+    snd_child = snd_children[0]
+    ### Check value cardinalities
+    type_analysis.check_federated_type(val.type_signature, placement=sender)
+    for v in (val, pk_receiver, sk_sender):
+      py_typecheck.check_len(v.internal_representation, 1)
+    py_typecheck.check_type(pk_receiver.type_signature.member,
+        tff.TensorType)
+    ### Materialize encryptor function definition & type spec
+    input_type = val.type_signature.member
+    self._input_type_cache = input_type
+    pk_rcv_type = pk_receiver.type_signature.member
+    sk_snd_type = sk_sender.type_signature.member
+    encryptor_arg_spec = (input_type, pk_rcv_type, sk_snd_type)
+    encryptor_proto, encryptor_type = utils.materialize_computation_from_cache(
+        sodium_comp.make_encryptor, _ENCRYPTOR_CACHE, encryptor_arg_spec)
+    ### Prepare encryption arguments
+    v = val.internal_representation[0]
+    pk = pk_receiver.internal_representation[0]
+    sk = sk_sender.internal_representation[0]
+    ### Encrypt the value for the single receiver and return it
+    encryptor_fn, nonce_seed = await asyncio.gather(
+        snd_child.create_value(encryptor_proto, encryptor_type),
+        snd_child.create_value(_nonce_seed(message_counter, 0),
+            sodium_comp.NONCE_SEED_TYPE))
+    encryptor_arg = await snd_child.create_struct([v, pk, sk, nonce_seed])
+    encrypted_value = await snd_child.create_call(encryptor_fn, encryptor_arg)
+    return federated_resolving_strategy.FederatedResolvingStrategyValue(
+        structure.from_container([encrypted_value]),
+        tff.StructType([
+            tff.FederatedType(encryptor_type.result, sender, all_equal=False)]))
+
+  def _encrypt_values_on_clients(self, val, sender, receiver,
+      message_counter):
     ###
     # Case 2: sender=CLIENTS
     #     plaintext: Fed(Tensor, CLIENTS, all_equal=False)
     #     pk_receiver: Fed(Tensor, CLIENTS, all_equal=True)
     #     sk_sender: Fed(Tensor, CLIENTS, all_equal=False)
     #   Returns:
-    #     encrypted_values: Fed(Tensor, CLIENTS, all_equal=False)
+    #     encrypted_values: one coroutine per client, each encrypting that
+    #         client's value independently of the others
+    #     encrypted_type: Fed(Tensor, CLIENTS, all_equal=False)
     ###
     ### Check proper key placement
     sk_sender = self.key_references.get_secret_key(sender)
@@ -269,25 +391,23 @@ class EasyBoxChannel(BaseChannel):
     pk_element_type = pk_rcv_type
     encryptor_arg_spec = (input_type, pk_element_type, sk_snd_type)
     encryptor_proto, encryptor_type = utils.materialize_computation_from_cache(
-        sodium_comp.make_encryptor, self._encryptor_cache, encryptor_arg_spec)
+        sodium_comp.make_encryptor, _ENCRYPTOR_CACHE, encryptor_arg_spec)
     ### Encrypt values and return them
-    encryptor_fns = asyncio.gather(*[
-        snd_child.create_value(encryptor_proto, encryptor_type)
-        for snd_child in snd_children])
-    encryptor_args = asyncio.gather(*[
-        snd_child.create_struct([v, pk, sk])
-        for v, pk, sk, snd_child in zip(
-            *federated_value_internals, snd_children)])
-    encryptor_fns, encryptor_args = await asyncio.gather(
-        encryptor_fns, encryptor_args)
+    async def encrypt_on_client(index, snd_child, v, pk, sk):
+      encryptor_fn, nonce_seed = await asyncio.gather(
+          snd_child.create_value(encryptor_proto, encryptor_type),
+          snd_child.create_value(_nonce_seed(message_counter, index),
+              sodium_comp.NONCE_SEED_TYPE))
+      encryptor_arg = await snd_child.create_struct([v, pk, sk, nonce_seed])
+      return await snd_child.create_call(encryptor_fn, encryptor_arg)
+
     encrypted_values = [
-        snd_child.create_call(encryptor, arg)
-        for encryptor, arg, snd_child in zip(
-            encryptor_fns, encryptor_args, snd_children)]
-    return federated_resolving_strategy.FederatedResolvingStrategyValue(
-        await asyncio.gather(*encrypted_values),
-        tff.FederatedType(encryptor_type.result, sender,
-            all_equal=val.type_signature.all_equal))
+        encrypt_on_client(i, snd_child, v, pk, sk)
+        for i, (snd_child, v, pk, sk) in enumerate(zip(
+            snd_children, *federated_value_internals))]
+    encrypted_type = tff.FederatedType(encryptor_type.result, sender,
+        all_equal=val.type_signature.all_equal)
+    return encrypted_values, encrypted_type
 
   async def _decrypt_values_on_clients(self, val, sender, receiver):
     ### Check proper key placement
@@ -318,7 +438,7 @@ class EasyBoxChannel(BaseChannel):
     decryptor_arg_spec = (input_element_type, pk_element_type, sk_rcv_type)
     decryptor_proto, decryptor_type = utils.materialize_computation_from_cache(
         sodium_comp.make_decryptor,
-        self._decryptor_cache,
+        _DECRYPTOR_CACHE,
         decryptor_arg_spec,
         orig_tensor_dtype=self._input_type_cache.dtype)
     ### Decrypt values and return them
@@ -341,8 +461,10 @@ class EasyBoxChannel(BaseChannel):
             all_equal=val.type_signature.all_equal))
 
   async def _decrypt_values_on_singleton(self, val, sender, receiver):
+    if sender is not tff.CLIENTS:
+      return await self._decrypt_value_from_singleton(val, sender, receiver)
     ### Check proper key placement
-    pk_sender = self.key_references.get_public_key(sender)
+    pk_sender = self.key_references.get_stacked_public_keys(sender)
     sk_receiver = self.key_references.get_secret_key(receiver)
     type_analysis.check_federated_type(pk_sender.type_signature,
         placement=receiver)
@@ -356,7 +478,7 @@ class EasyBoxChannel(BaseChannel):
     py_typecheck.check_len(rcv_children, 1)
     rcv_child = rcv_children[0]
     ### Check value cardinalities
-    py_typecheck.check_len(pk_sender.internal_representation, len(snd_children))
+    py_typecheck.check_len(pk_sender.internal_representation, 1)
     py_typecheck.check_len(sk_receiver.internal_representation, 1)
     ### Materialize decryptor type_spec & function definition
     py_typecheck.check_type(val.type_signature, tff.StructType)
@@ -365,40 +487,88 @@ class EasyBoxChannel(BaseChannel):
     input_type = val.type_signature[0].member
     #   each input_type is a tuple needed for one value to be decrypted
     py_typecheck.check_type(input_type, tff.StructType)
-    py_typecheck.check_type(pk_snd_type, tff.StructType)
-    py_typecheck.check_len(val.type_signature, len(pk_snd_type))
-    input_element_type = input_type
-    pk_element_type = pk_snd_type[0]
-    decryptor_arg_spec = (input_element_type, pk_element_type, sk_rcv_type)
+    py_typecheck.check_type(pk_snd_type, tff.TensorType)
+    py_typecheck.check_len(val.type_signature, len(snd_children))
+    if pk_snd_type.shape[0] != len(snd_children):
+      raise ValueError(
+          'Expected {} stacked public keys for placement {}, found {}.'.format(
+              len(snd_children), sender, pk_snd_type.shape[0]))
+    input_batch_type = tff.StructType(
+        [vt.member for vt in val.type_signature])
+    decryptor_arg_spec = (input_batch_type, pk_snd_type, sk_rcv_type)
     decryptor_proto, decryptor_type = utils.materialize_computation_from_cache(
-        sodium_comp.make_decryptor,
-        self._decryptor_cache,
+        sodium_comp.make_batch_decryptor,
+        _BATCH_DECRYPTOR_CACHE,
         decryptor_arg_spec,
         orig_tensor_dtype=self._input_type_cache.dtype)
-    ### Decrypt values and return them
-    vals = val.internal_representation
+    ### Decrypt values from all senders in one call and return them
+    pk = pk_sender.internal_representation[0]
     sk = sk_receiver.internal_representation[0]
-    decryptor_fn = await rcv_child.create_value(decryptor_proto, decryptor_type)
-    decryptor_args = await asyncio.gather(*[
-        rcv_child.create_struct([v, pk, sk])
-        for v, pk in zip(vals, pk_sender.internal_representation)])
+    decryptor_fn, vals = await asyncio.gather(
+        rcv_child.create_value(decryptor_proto, decryptor_type),
+        rcv_child.create_struct(list(val.internal_representation)))
+    decryptor_arg = await rcv_child.create_struct([vals, pk, sk])
+    decrypted_batch = await rcv_child.create_call(decryptor_fn, decryptor_arg)
     decrypted_values = await asyncio.gather(*[
-        rcv_child.create_call(decryptor_fn, arg)
-        for arg in decryptor_args])
-    decrypted_value_types = [decryptor_type.result] * len(decrypted_values)
+        rcv_child.create_selection(decrypted_batch, i)
+        for i in range(len(snd_children))])
     return federated_resolving_strategy.FederatedResolvingStrategyValue(
         structure.from_container(decrypted_values),
         tff.StructType([
             tff.FederatedType(dvt, receiver, all_equal=True)
-            for dvt in decrypted_value_types]))
+            for dvt in decryptor_type.result]))
+
+  async def _decrypt_value_from_singleton(self, val, sender, receiver):
+    ### Check proper key placement
+    pk_sender = self.key_references.get_public_key(sender)
+    sk_receiver = self.key_references.get_secret_key(receiver)
+    type_analysis.check_federated_type(pk_sender.type_signature,
+        placement=receiver)
+    type_analysis.check_federated_type(sk_receiver.type_signature,
+        placement=receiver)
+    pk_snd_type = pk_sender.type_signature.member
+    sk_rcv_type = sk_receiver.type_signature.member
+    ### Check placement cardinalities
+    rcv_children = self.strategy._get_child_executors(receiver)
+    py_typecheck.check_len(rcv_children, 1)
+    rcv_child = rcv_children[0]
+    ### Check value cardinalities
+    py_typecheck.check_len(pk_sender.internal_representation, 1)
+    py_typecheck.check_len(sk_receiver.internal_representation, 1)
+    py_typecheck.check_type(val.type_signature, tff.StructType)
+    py_typecheck.check_len(val.type_signature, 1)
+    type_analysis.check_federated_type(val.type_signature[0],
+        placement=receiver, all_equal=True)
+    ### Materialize decryptor type_spec & function definition
+    input_type = val.type_signature[0].member
+    #   input_type is the tuple needed for the value to be decrypted
+    py_typecheck.check_type(input_type, tff.StructType)
+    py_typecheck.check_type(pk_snd_type, tff.TensorType)
+    decryptor_arg_spec = (input_type, pk_snd_type, sk_rcv_type)
+    decryptor_proto, decryptor_type = utils.materialize_computation_from_cache(
+        sodium_comp.make_decryptor,
+        _DECRYPTOR_CACHE,
+        decryptor_arg_spec,
+        orig_tensor_dtype=self._input_type_cache.dtype)
+    ### Decrypt the value and return it
+    pk = pk_sender.internal_representation[0]
+    sk = sk_receiver.internal_representation[0]
+    decryptor_fn, decryptor_arg = await asyncio.gather(
+        rcv_child.create_value(decryptor_proto, decryptor_type),
+        rcv_child.create_struct([val.internal_representation[0], pk, sk]))
+    decrypted_value = await rcv_child.create_call(decryptor_fn, decryptor_arg)
+    return federated_resolving_strategy.FederatedResolvingStrategyValue(
+        structure.from_container([decrypted_value]),
+        tff.StructType([
+            tff.FederatedType(decryptor_type.result, receiver, all_equal=True)]))
 
   async def _generate_keys(self, key_owner):
     py_typecheck.check_type(key_owner, placement_literals.PlacementLiteral)
     executors = self.strategy._get_child_executors(key_owner)
-    if self._key_generator is None:
-      self._key_generator = sodium_comp.make_keygen()
-    keygen, keygen_type = utils.lift_to_computation_spec(self._key_generator)
-    pk_vals, sk_vals = [], []
+    if self._keygen_spec is None:
+      self._keygen_spec = utils.lift_to_computation_spec(
+          sodium_comp.make_keygen())
+    keygen, keygen_type = self._keygen_spec
     async def keygen_call(child):
       return await child.create_call(await child.create_value(
           keygen, keygen_type))
@@ -436,14 +606,56 @@ class EasyBoxChannel(BaseChannel):
       executor = children[0]
       vals = [executor.create_value(v, key_type) for v in val]
       vals_type = tff.FederatedType(type_conversions.infer_type(val), key_receiver)
+      # also stack the keys, so the receiver can encrypt for all of them at once
+      stacked_type = tff.TensorType(key_type.dtype,
+          [len(val)] + key_type.shape.as_list())
+      stacked_val, vals = await asyncio.gather(
+          executor.create_value(np.stack(val), stacked_type),
+          asyncio.gather(*vals))
+      stacked_public_keys = (
+          federated_resolving_strategy.FederatedResolvingStrategyValue(
+              [stacked_val],
+              tff.FederatedType(stacked_type, key_receiver, all_equal=True)))
     else:
       # sharing 1 key with n executors
       # val is a single tensor
-      vals = [c.create_value(val, key_type) for c in children]
+      vals = await asyncio.gather(*[
+          c.create_value(val, key_type) for c in children])
       vals_type = tff.FederatedType(key_type, key_receiver, all_equal=True)
+      stacked_public_keys = None
     public_key_rcv = federated_resolving_strategy.FederatedResolvingStrategyValue(
-        await asyncio.gather(*vals), vals_type)
-    self.key_references.update_keys(key_owner, public_key=public_key_rcv)
+        vals, vals_type)
+    self.key_references.update_keys(key_owner, public_key=public_key_rcv,
+        stacked_public_keys=stacked_public_keys)
+
+
+def _nonce_seed(message_counter, index):
+  return np.array([message_counter, index], dtype=np.int64)
+
+
+async def _forward_to_singleton(sent_members, rcv_child, receiver_placement,
+    all_equal):
+  # Each client's message is placed on the receiver as soon as that client's
+  # send has finished, rather than after every client's message is ready.
+  async def forward(sent_member):
+    message = await (await sent_member).compute()
+    message_type = type_conversions.infer_type(message)
+    return await rcv_child.create_value(message, message_type), message_type
+
+  if all_equal:
+    # Every client holds the same message, so only the first is forwarded;
+    # the other sends still run to completion.
+    (message_value, message_type), *_ = await asyncio.gather(
+        forward(sent_members[0]), *sent_members[1:])
+    return federated_resolving_strategy.FederatedResolvingStrategyValue(
+        message_value,
+        tff.FederatedType(message_type, receiver_placement, all_equal))
+  forwarded = await asyncio.gather(*[forward(m) for m in sent_members])
+  return federated_resolving_strategy.FederatedResolvingStrategyValue(
+      structure.from_container([v for v, _ in forwarded]),
+      tff.StructType([
+          tff.FederatedType(mt, receiver_placement, True)
+          for _, mt in forwarded]))
 
 
 def _get_other_placement(this_placement, both_placements):
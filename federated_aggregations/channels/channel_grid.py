@@ -18,7 +18,10 @@ class ChannelGrid:
 
   Attributes:
     requires_setup: Tracks whether the underlying channels of the grid have
-        been set up; only some Channels require this setup phase.
+        been set up; only some Channels require this setup phase. Once set,
+        further calls to `setup_channels` are no-ops. Channels stay bound to
+        the executors of the strategy that set them up, so a grid must only
+        be used with a single strategy and its executor stack.
   """
   _channel_dict: Dict[channel.PlacementPair, channel.Channel]
   requires_setup: bool = True
@@ -39,5 +42,5 @@ class ChannelGrid:
   def __getitem__(self, placements: channel.PlacementPair):
     py_typecheck.check_type(placements, tuple)
     py_typecheck.check_len(placements, 2)
-    sorted_placements = sorted(placements, key=lambda p: p.uri)
-    return self._channel_dict.get(tuple(sorted_placements))
+    p0, p1 = placements
+    return self._channel_dict.get((p0, p1) if p0.uri <= p1.uri else (p1, p0))
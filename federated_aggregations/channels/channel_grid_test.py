@@ -14,3 +14,17 @@ class ChannelGridTest(utils.AsyncTestCase):
     channel = channel_grid[(tff.CLIENTS, tff.SERVER)]
 
     assert isinstance(channel, ch.PlaintextChannel)
+
+  def test_channel_grid_setup_is_idempotent(self):
+    channel_grid = grid.ChannelGrid(
+        {(tff.CLIENTS, tff.SERVER): ch.EasyBoxChannel})
+    ex = utils.create_test_executor(channel_grid=channel_grid)
+    self.run_sync(channel_grid.setup_channels(ex._strategy))
+    channel = channel_grid[(tff.CLIENTS, tff.SERVER)]
+    pk_clients = channel.key_references.get_public_key(tff.CLIENTS)
+
+    self.run_sync(channel_grid.setup_channels(ex._strategy))
+
+    self.assertIs(channel_grid[(tff.CLIENTS, tff.SERVER)], channel)
+    self.assertIs(
+        channel.key_references.get_public_key(tff.CLIENTS), pk_clients)
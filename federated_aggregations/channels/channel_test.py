@@ -1,9 +1,4 @@
-from unittest import mock
-
-from absl.testing import absltest
 from absl.testing import parameterized
-
-import asyncio
 import tensorflow as tf
 import tensorflow_federated as tff
 from tensorflow_federated.python.common_libs import structure
@@ -14,6 +9,7 @@ from tensorflow_federated.python.core.impl.types import type_conversions
 from federated_aggregations.channels import channel as ch
 from federated_aggregations.channels import channel_grid as grid
 from federated_aggregations.channels import channel_test_utils as utils
+from federated_aggregations.paillier import placement as paillier_placement
 
 
 class PlaintextChannelTest(utils.AsyncTestCase):
@@ -65,6 +61,22 @@ class EasyBoxChannelTest(utils.AsyncTestCase):
     self.assertEqual(str(pk_server.type_signature), 'uint8[32]@CLIENTS')
     self.assertEqual(str(sk_server.type_signature), 'uint8[32]@SERVER')
 
+  def test_stack_client_public_keys_on_server(self):
+    fed_ex = utils.create_test_executor()
+    strategy = fed_ex._strategy
+    channel_grid = strategy.channel_grid
+    self.run_sync(channel_grid.setup_channels(strategy))
+
+    channel = channel_grid[(tff.CLIENTS, tff.SERVER)]
+    stacked_pk_clients = channel.key_references.get_stacked_public_keys(
+        tff.CLIENTS)
+    stacked_pk_server = channel.key_references.get_stacked_public_keys(
+        tff.SERVER)
+
+    self.assertEqual(str(stacked_pk_clients.type_signature),
+        'uint8[3,32]@SERVER')
+    self.assertIsNone(stacked_pk_server)
+
   @parameterized.named_parameters(
       ("clients_to_server", [1., 2., 3.], tff.CLIENTS, tff.SERVER,
           [tf.constant(i + 1, dtype=tf.float32) for i in range(3)]),
@@ -89,3 +101,31 @@ class EasyBoxChannelTest(utils.AsyncTestCase):
     else:
       for d in decrypted:
         self.assertEqual(d, expected)
+
+  @parameterized.named_parameters(
+      ("server_to_aggregator", tff.SERVER, paillier_placement.AGGREGATOR),
+      ("aggregator_to_server", paillier_placement.AGGREGATOR, tff.SERVER))
+  def test_transfer_between_singletons(self, source_placement,
+      target_placement):
+    channel_grid = grid.ChannelGrid(
+        {(paillier_placement.AGGREGATOR, tff.SERVER): ch.EasyBoxChannel})
+    strategy_executors = {
+        tff.SERVER: utils.create_bottom_stack(),
+        tff.CLIENTS: [utils.create_bottom_stack() for _ in range(3)],
+        paillier_placement.AGGREGATOR: utils.create_bottom_stack(),
+    }
+    fed_ex = tff.framework.FederatingExecutor(
+        utils.MockStrategy.factory(strategy_executors, channel_grid),
+        unplaced_executor=utils.create_bottom_stack())
+    self.run_sync(channel_grid.setup_channels(fed_ex._strategy))
+
+    channel = channel_grid[(source_placement, target_placement)]
+    val = self.run_sync(fed_ex.create_value(2.0,
+        tff.FederatedType(tf.float32, source_placement, all_equal=True)))
+    transferred = self.run_sync(channel.transfer(val))
+    decrypted = self.run_sync(transferred.compute())
+
+    self.assertLen(transferred.type_signature, 1)
+    self.assertIs(transferred.type_signature[0].placement, target_placement)
+    self.assertEqual(structure.flatten(decrypted),
+        [tf.constant(2.0, dtype=tf.float32)])
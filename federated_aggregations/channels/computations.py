@@ -1,35 +1,90 @@
+import functools
+
+import tensorflow as tf
 import tensorflow_federated as tff
 from tf_encrypted.primitives.sodium import easy_box
 
+NONCE_SEED_TYPE = tff.TensorType(tf.int64, [2])
+
 
 def make_encryptor(plaintext_type, pk_rcv_type, sk_snd_type):
-  @tff.tf_computation(plaintext_type, pk_rcv_type, sk_snd_type)
-  def encrypt_tensor(plaintext, pk_rcv, sk_snd):
-    pk_rcv = easy_box.PublicKey(pk_rcv)
-    sk_snd = easy_box.SecretKey(sk_snd)
-    nonce = easy_box.gen_nonce()
-    ciphertext, mac = easy_box.seal_detached(plaintext, nonce, pk_rcv, sk_snd)
-    return ciphertext.raw, mac.raw, nonce.raw
+  @tff.tf_computation(plaintext_type, pk_rcv_type, sk_snd_type, NONCE_SEED_TYPE)
+  def encrypt_tensor(plaintext, pk_rcv, sk_snd, nonce_seed):
+    return _seal(plaintext, pk_rcv, sk_snd, nonce_seed)
 
   return encrypt_tensor
 
 
+def make_batch_encryptor(plaintext_type, pk_rcv_batch_type, sk_snd_type):
+  """Encrypts one plaintext for each row of a stacked batch of public keys.
+
+  The nonce seed for the i-th receiver is `nonce_seed + [0, i]`, matching the
+  seeds used by the per-receiver encryptor.
+  """
+  num_receivers = pk_rcv_batch_type.shape[0]
+
+  @tff.tf_computation(
+      plaintext_type, pk_rcv_batch_type, sk_snd_type, NONCE_SEED_TYPE)
+  def encrypt_tensor_batch(plaintext, pk_rcv_batch, sk_snd, nonce_seed):
+    return tuple(
+        _seal(plaintext, pk_rcv_batch[i], sk_snd,
+            nonce_seed + tf.constant([0, i], dtype=tf.int64))
+        for i in range(num_receivers))
+
+  return encrypt_tensor_batch
+
+
+def _seal(plaintext, pk_rcv, sk_snd, nonce_seed):
+  pk_rcv = easy_box.PublicKey(pk_rcv)
+  sk_snd = easy_box.SecretKey(sk_snd)
+  # The nonce only needs to be unique per key pair, so we encode the
+  # (message counter, client index) seed directly into its 24 bytes instead
+  # of drawing from libsodium's CSPRNG on every call.
+  nonce_words = tf.concat([nonce_seed, tf.zeros([1], dtype=tf.int64)], axis=0)
+  nonce = easy_box.Nonce(tf.reshape(tf.bitcast(nonce_words, tf.uint8), [24]))
+  ciphertext, mac = easy_box.seal_detached(plaintext, nonce, pk_rcv, sk_snd)
+  return ciphertext.raw, mac.raw, nonce.raw
+
+
+def _open(sender_values, pk_snd, sk_rcv, orig_tensor_dtype):
+  ciphertext = easy_box.Ciphertext(sender_values[0])
+  mac = easy_box.Mac(sender_values[1])
+  nonce = easy_box.Nonce(sender_values[2])
+  pk_snd = easy_box.PublicKey(pk_snd)
+  sk_rcv = easy_box.SecretKey(sk_rcv)
+  return easy_box.open_detached(
+      ciphertext, mac, nonce, pk_snd, sk_rcv, orig_tensor_dtype)
+
+
 def make_decryptor(sender_values_type, pk_snd_type, sk_rcv_snd,
     orig_tensor_dtype):
   @tff.tf_computation(sender_values_type, pk_snd_type, sk_rcv_snd)
   def decrypt_tensor(sender_values, pk_snd, sk_rcv):
-    ciphertext = easy_box.Ciphertext(sender_values[0])
-    mac = easy_box.Mac(sender_values[1])
-    nonce = easy_box.Nonce(sender_values[2])
-    pk_snd = easy_box.PublicKey(pk_snd)
-    sk_rcv = easy_box.SecretKey(sk_rcv)
-    plaintext_recovered = easy_box.open_detached(
-        ciphertext, mac, nonce, pk_snd, sk_rcv, orig_tensor_dtype)
-    return plaintext_recovered
+    return _open(sender_values, pk_snd, sk_rcv, orig_tensor_dtype)
 
   return decrypt_tensor
 
 
+def make_batch_decryptor(sender_values_batch_type, pk_snd_batch_type,
+    sk_rcv_type, orig_tensor_dtype):
+  """Decrypts one value from each sender, given their stacked public keys.
+
+  The per-sender decryptions are independent ops in a single graph, so they
+  run in one call and can be scheduled in parallel by TensorFlow.
+  """
+  num_senders = pk_snd_batch_type.shape[0]
+
+  @tff.tf_computation(sender_values_batch_type, pk_snd_batch_type, sk_rcv_type)
+  def decrypt_tensor_batch(sender_values_batch, pk_snd_batch, sk_rcv):
+    return tuple(
+        _open(sender_values_batch[i], pk_snd_batch[i], sk_rcv,
+            orig_tensor_dtype)
+        for i in range(num_senders))
+
+  return decrypt_tensor_batch
+
+
+@functools.lru_cache(maxsize=None)
 def make_keygen():
   @tff.tf_computation()
   def key_generator():
@@ -1,46 +1,64 @@
 import collections
 
 import tensorflow_federated as tff
-from tensorflow_federated.python.common_libs import py_typecheck
 from tensorflow_federated.python.core.impl.executors import federated_resolving_strategy
 from tensorflow_federated.python.core.impl.types import placement_literals
 
 
+_KeyEntry = collections.namedtuple(
+    '_KeyEntry', ['pk', 'sk', 'stacked_pk'], defaults=(None, None, None))
+
+
 class KeyStore:
   """A container for key management and storage.
 
-  This is only used during the setup phase of EasyBoxChannel.
+  This is only used during the setup phase of EasyBoxChannel. Alongside the
+  per-executor public keys, the store can hold a single stacked tensor of the
+  public keys of a multi-executor placement, as received by a singleton.
   """
-  _default_store = lambda k: {'pk': None, 'sk': None}
+  __slots__ = ('_key_store',)
 
   def __init__(self):
-    self._key_store = collections.defaultdict(self._default_store)
+    self._key_store = collections.defaultdict(_KeyEntry)
 
   def get_key_pair(self, key_owner):
-    key_owner_cache = self._get_keys(key_owner)
-    return key_owner_cache['pk'], key_owner_cache['sk']
+    keys = self._get_keys(key_owner)
+    return keys.pk, keys.sk
 
   def get_public_key(self, key_owner):
-    return self._get_keys(key_owner)['pk']
+    return self._get_keys(key_owner).pk
 
   def get_secret_key(self, key_owner):
-    return self._get_keys(key_owner)['sk']
+    return self._get_keys(key_owner).sk
+
+  def get_stacked_public_keys(self, key_owner):
+    return self._get_keys(key_owner).stacked_pk
 
   def _get_keys(self, key_owner):
-    py_typecheck.check_type(key_owner, placement_literals.PlacementLiteral)
     return self._key_store[key_owner.name]
 
-  def update_keys(self, key_owner, public_key=None, secret_key=None):
-    key_owner_cache = self._get_keys(key_owner)
+  def update_keys(
+      self,
+      key_owner,
+      public_key=None,
+      secret_key=None,
+      stacked_public_keys=None):
+    assert isinstance(key_owner, placement_literals.PlacementLiteral)
+    updates = {}
     if public_key is not None:
       self._check_key_type(public_key)
-      key_owner_cache['pk'] = public_key
+      updates['pk'] = public_key
     if secret_key is not None:
       self._check_key_type(secret_key)
-      key_owner_cache['sk'] = secret_key
+      updates['sk'] = secret_key
+    if stacked_public_keys is not None:
+      self._check_key_type(stacked_public_keys)
+      updates['stacked_pk'] = stacked_public_keys
+    self._key_store[key_owner.name] = self._get_keys(key_owner)._replace(
+        **updates)
 
   def _check_key_type(self, key):
-    py_typecheck.check_type(key,
+    assert isinstance(key,
         federated_resolving_strategy.FederatedResolvingStrategyValue)
-    py_typecheck.check_type(key.type_signature,
-        (tff.StructType, tff.FederatedType))
\ No newline at end of file
+    assert isinstance(key.type_signature,
+        (tff.StructType, tff.FederatedType))
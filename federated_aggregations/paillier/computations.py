@@ -1,8 +1,11 @@
+import functools
+
 import tensorflow as tf
 import tensorflow_federated as tff
 from tf_encrypted.primitives import paillier
 
 
+@functools.lru_cache(maxsize=None)
 def make_keygen(transit_dtype=tf.int32, modulus_bitlength=2048):
   @tff.tf_computation
   def _keygen():
@@ -14,10 +17,34 @@ def make_keygen(transit_dtype=tf.int32, modulus_bitlength=2048):
   return _keygen
 
 
-def make_encryptor(transit_dtype=tf.int32):
+def make_key_inputter(encryption_key_raw, decryption_key_raw):
+  """Returns a key inputter that yields an existing, exported key pair."""
   @tff.tf_computation
-  def _encrypt(encryption_key_raw, plaintext):
-    ek = paillier.EncryptionKey(encryption_key_raw)
+  def _key_inputter():
+    ek_raw = tf.constant(encryption_key_raw)
+    dk_raw = tuple(tf.constant(k) for k in decryption_key_raw)
+    return ek_raw, dk_raw
+
+  return _key_inputter
+
+
+def make_encryptor(
+    plaintext_type,
+    encryption_key_raw,
+    transit_dtype=tf.int32,
+    output_shape=None,
+):
+  """Encrypts a plaintext under a fixed encryption key.
+
+  As in make_sequence_sum, the raw encryption key is captured as a constant
+  in the traced graph. If output_shape is given, the plaintext is reshaped to
+  it before encryption.
+  """
+  @tff.tf_computation(plaintext_type)
+  def _encrypt(plaintext):
+    if output_shape is not None:
+      plaintext = tf.reshape(plaintext, output_shape)
+    ek = paillier.EncryptionKey(tf.constant(encryption_key_raw))
     ciphertext = paillier.encrypt(ek, plaintext)
     return ciphertext.export(dtype=transit_dtype)
 
@@ -25,14 +52,13 @@ def make_encryptor(transit_dtype=tf.int32):
 
 
 def make_decryptor(
-    decryption_key_type,
-    encryption_key_type,
+    key_pair_type,
     ciphertext_type,
     export_dtype,
 ):
-  @tff.tf_computation(
-      decryption_key_type, encryption_key_type, ciphertext_type)
-  def _decrypt(decryption_key_raw, encryption_key_raw, ciphertext_raw):
+  @tff.tf_computation(key_pair_type, ciphertext_type)
+  def _decrypt(key_pair_raw, ciphertext_raw):
+    encryption_key_raw, decryption_key_raw = key_pair_raw
     dk = paillier.DecryptionKey(*decryption_key_raw)
     ek = paillier.EncryptionKey(encryption_key_raw)
     ciphertext = paillier.Ciphertext(ek, ciphertext_raw)
@@ -41,24 +67,28 @@ def make_decryptor(
   return _decrypt
 
 
-def make_sequence_sum(transit_dtype=tf.int32):
-  def adder(ek, xs):
-    assert len(xs) >= 1
-    if len(xs) == 1:
-      return xs[0]
-    split = len(xs) // 2
-    left = xs[:split]
-    right = xs[split:]
-    return paillier.add(ek, adder(ek, left), adder(ek, right), do_refresh=False)
+def make_sequence_sum(summands_type, encryption_key_raw, transit_dtype=tf.int32):
+  """Sums Paillier ciphertexts under a fixed encryption key.
 
-  @tff.tf_computation
-  def _sequence_sum(encryption_key_raw, summands_raw):
-    ek = paillier.EncryptionKey(encryption_key_raw)
+  The raw encryption key is captured as a constant in the traced graph, so
+  the resulting computation only takes the summands as input.
+  """
+  def adder(ek, xs, lo, hi):
+    assert hi - lo >= 1
+    if hi - lo == 1:
+      return xs[lo]
+    mid = (lo + hi) // 2
+    return paillier.add(
+        ek, adder(ek, xs, lo, mid), adder(ek, xs, mid, hi), do_refresh=False)
+
+  @tff.tf_computation(summands_type)
+  def _sequence_sum(summands_raw):
+    ek = paillier.EncryptionKey(tf.constant(encryption_key_raw))
     summands = [
         paillier.Ciphertext(ek, summand)
         for summand in summands_raw
     ]
-    result = adder(ek, summands)
+    result = adder(ek, summands, 0, len(summands))
     refreshed_result = paillier.refresh(ek, result)
     return refreshed_result.export(dtype=transit_dtype)
 
@@ -66,6 +96,12 @@ def make_sequence_sum(transit_dtype=tf.int32):
 
 
 def make_reshape_tensor(tensor_type, output_shape):
+  del tensor_type  # the reshaper is polymorphic in its input
+  return _make_reshape_tensor(tuple(output_shape))
+
+
+@functools.lru_cache(maxsize=256)
+def _make_reshape_tensor(output_shape):
   @tff.tf_computation
   def _reshape_tensor(tensor):
     return tf.reshape(tensor, output_shape)
@@ -4,6 +4,7 @@ from typing import List, Callable, Optional, Sequence
 import tensorflow as tf
 import tensorflow_federated as tff
 from tensorflow_federated.python.common_libs import py_typecheck
+from tensorflow_federated.python.core.impl.executors import caching_executor
 from tensorflow_federated.python.core.impl.executors import eager_tf_executor
 from tensorflow_federated.python.core.impl.executors import executor_base
 from tensorflow_federated.python.core.impl.executors import executor_factory
@@ -49,6 +50,8 @@ class AggregatingUnplacedExecutorFactory(executor_stacks.UnplacedExecutorFactory
           'arguments. Received cardinalities: {}.'.format(cardinalities))
     if placement == paillier_placement.AGGREGATOR:
       ex = eager_tf_executor.EagerTFExecutor(device=self._aggregator_device)
+      if self._use_caching:
+        ex = caching_executor.CachingExecutor(ex)
       return executor_stacks._wrap_executor_in_threading_stack(ex)
     return super().create_executor(
         cardinalities=cardinalities, placement=placement)
@@ -56,6 +59,15 @@ class AggregatingUnplacedExecutorFactory(executor_stacks.UnplacedExecutorFactory
 
 class PaillierAggregatingExecutorFactory(executor_stacks.FederatingExecutorFactory):
 
+  def __init__(self, *, key_inputter=None, **kwargs):
+    super().__init__(**kwargs)
+    # NOTE: we let the server generate it's own key here, but for proper
+    # deployment we would want to supply a key verified by proper PKI.
+    # Only the keygen computation is shared; each executor's strategy still
+    # generates a fresh key pair on its server at the first secure sum.
+    self._key_inputter = key_inputter or paillier_comp.make_keygen(
+        modulus_bitlength=2048)
+
   def create_executor(
       self, cardinalities: executor_factory.CardinalitiesType
   ) -> executor_base.Executor:
@@ -96,9 +108,7 @@ class PaillierAggregatingExecutorFactory(executor_stacks.FederatingExecutorFacto
             paillier_placement.AGGREGATOR: paillier_stack,
         },
         channel_grid=secure_channel_grid,
-        # NOTE: we let the server generate it's own key here, but for proper
-        # deployment we would want to supply a key verified by proper PKI
-        key_inputter=paillier_comp.make_keygen(modulus_bitlength=2048))
+        key_inputter=self._key_inputter)
     unplaced_executor = self._unplaced_executor_factory.create_executor(
         cardinalities={})
     executor = federating_executor.FederatingExecutor(
@@ -111,7 +121,8 @@ def local_paillier_executor_factory(
     num_client_executors=32,
     server_tf_device=None,
     aggregator_tf_device=None,
-    client_tf_devices=tuple()):
+    client_tf_devices=tuple(),
+    key_inputter=None):
   """Like tff.framework.local_executor_factory, but with Paillier aggregation.
   
   The resulting factory function does not implement composing executor stacks,
@@ -134,6 +145,10 @@ def local_paillier_executor_factory(
     client_tf_devices: List/tuple of `tf.config.LogicalDevice` to place clients
       for simulation. Possibly accelerators returned by
       `tf.config.list_logical_devices()`.
+    key_inputter: An optional no-arg `tff.tf_computation` returning an
+      exported Paillier key pair `(ek, (p, q))`, e.g. from
+      `computations.make_key_inputter`. If unspecified, the server generates
+      a fresh key pair.
   """
   # TODO consider parameterizing this function with channel_grid
   if server_tf_device is not None:
@@ -150,7 +165,8 @@ def local_paillier_executor_factory(
       num_client_executors=num_client_executors,
       unplaced_ex_factory=unplaced_ex_factory,
       num_clients=num_clients,
-      use_sizing=False)
+      use_sizing=False,
+      key_inputter=key_inputter)
   factory_fn = paillier_aggregating_executor_factory.create_executor
   return tff.framework.create_executor_factory(
       paillier_aggregating_executor_factory.create_executor)
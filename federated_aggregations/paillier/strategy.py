@@ -1,16 +1,12 @@
 import asyncio
-from collections import OrderedDict
 
+import numpy as np
 import tensorflow_federated as tff
 from tensorflow_federated.python.common_libs import py_typecheck
-from tensorflow_federated.python.core.api import computation_types
 from tensorflow_federated.python.core.impl.executors import federated_resolving_strategy
-from tensorflow_federated.python.core.impl.types import placement_literals
 from tensorflow_federated.python.core.impl.types import type_analysis
-from tensorflow_federated.python.core.impl.types import type_conversions
 
 from federated_aggregations import utils
-from federated_aggregations.channels import channel
 from federated_aggregations.paillier import placement as paillier_placement
 from federated_aggregations.paillier import computations as paillier_comp
 
@@ -49,11 +45,12 @@ class PaillierAggregatingStrategy(tff.framework.FederatedResolvingStrategy):
     self._check_for_paillier_placement()
     self.channel_grid = channel_grid
     self._requires_setup = True  # lazy key setup
+    self._setup_lock = None  # created on the executor's event loop
     self._key_inputter = key_inputter
-    self._paillier_encryptor = paillier_comp.make_encryptor()
-    self._paillier_sequence_sum = paillier_comp.make_sequence_sum()
-    self._paillier_decryptor_cache = {}
-    self._reshape_function_cache = {}
+    self._make_encryptor = None  # bound to the encryption key in setup
+    self._make_sequence_sum = None  # bound to the encryption key in setup
+    self._computation_cache = {}
+    self._fn_value_cache = {}  # reset with the key in setup
 
   def _get_child_executors(self, placement, index=None):
     child_executors = self._target_executors[placement]
@@ -72,31 +69,48 @@ class PaillierAggregatingStrategy(tff.framework.FederatedResolvingStrategy):
           '{}.'.format(paillier_placement.AGGREGATOR, paillier_cardinality))
   
   async def _move(self, value, source_placement, target_placement):
-    await self.channel_grid.setup_channels(self)
+    # Channels are set up once in _paillier_setup, before the first move.
     channel = self.channel_grid[(source_placement, target_placement)]
     return await channel.transfer(value)
 
+  async def _paillier_setup_once(self):
+    # Concurrent first calls must not generate and broadcast keys twice.
+    if self._setup_lock is None:
+      self._setup_lock = asyncio.Lock()
+    async with self._setup_lock:
+      if self._requires_setup:
+        await self._paillier_setup()
+        self._requires_setup = False
+
   async def _paillier_setup(self):
+    await self.channel_grid.setup_channels(self)
     # Load paillier keys on server
     key_inputter = await self._executor.create_value(self._key_inputter)
     _check_key_inputter(key_inputter)
     fed_output = await self._eval(key_inputter, tff.SERVER, all_equal=True)
     output = fed_output.internal_representation[0]
-    # Broadcast encryption key to all placements
+    # Select the encryption key from the key pair on the server
     server_executor = self._get_child_executors(tff.SERVER, index=0)
     ek_ref = await server_executor.create_selection(output, index=0)
-    ek = federated_resolving_strategy.FederatedResolvingStrategyValue(ek_ref,
-        tff.FederatedType(ek_ref.type_signature, tff.SERVER, True))
-    placed = await asyncio.gather(
-      self._move(ek, tff.SERVER, tff.CLIENTS),
-      self._move(ek, tff.SERVER, paillier_placement.AGGREGATOR))
-    self.encryption_key_server = ek
-    self.encryption_key_clients = placed[0]
-    self.encryption_key_paillier = placed[1]
-    # Keep decryption key on server with formal placement
-    dk_ref = await server_executor.create_selection(output, index=1)
-    self.decryption_key = federated_resolving_strategy.FederatedResolvingStrategyValue(dk_ref,
-        tff.FederatedType(dk_ref.type_signature, tff.SERVER, all_equal=True))
+    # The encryption key is public, so rather than broadcasting it we
+    # specialize the clients' encryptors and the aggregator's sum to it.
+    # Binding it here keeps the key out of the computation cache keys; a
+    # strategy only ever has one key, so argument types are enough.
+    encryption_key_raw = np.asarray(await ek_ref.compute())
+
+    def make_encryptor(plaintext_type, output_shape=None):
+      return paillier_comp.make_encryptor(
+          plaintext_type, encryption_key_raw, output_shape=output_shape)
+
+    def make_sequence_sum(summands_type):
+      return paillier_comp.make_sequence_sum(summands_type, encryption_key_raw)
+
+    self._make_encryptor = make_encryptor
+    self._make_sequence_sum = make_sequence_sum
+    # Function values created on child executors close over this key.
+    self._fn_value_cache = {}
+    # Keep the (ek, dk) key pair on server as a single value for decryption
+    self.key_pair_server = fed_output
 
   async def compute_federated_secure_sum(self, arg):
     self._check_arg_is_structure(arg)
@@ -106,103 +120,107 @@ class PaillierAggregatingStrategy(tff.framework.FederatedResolvingStrategy):
     py_typecheck.check_type(value_type.member, tff.TensorType)
     # Stash input dtype for later
     input_tensor_dtype = value_type.member.dtype
-    # Paillier setup phase
+    # Paillier setup phase, overlapped with selecting the client summands
     if self._requires_setup:
-      await self._paillier_setup()
-      self._requires_setup = False
-    # Stash input shape, and reshape input tensor to matrix-form
+      _, clients_value = await asyncio.gather(
+          self._paillier_setup_once(),
+          self._executor.create_selection(arg, index=0))
+    else:
+      clients_value = await self._executor.create_selection(arg, index=0)
+    # Stash input shape; the encryptor reshapes the input to matrix-form
     input_tensor_shape = value_type.member.shape
     if len(input_tensor_shape) != 2:
-      clients_value = await self._compute_reshape_on_tensor(
-          await self._executor.create_selection(arg, index=0),
-          output_shape=[1, input_tensor_shape.num_elements()])
+      matrix_shape = (1, input_tensor_shape.num_elements())
     else:
-      clients_value = await self._executor.create_selection(arg, index=0)
+      matrix_shape = None
     # Encrypt summands on tff.CLIENTS
     encrypted_values = await self._compute_paillier_encryption(
-        self.encryption_key_clients, clients_value)
+        clients_value, output_shape=matrix_shape)
     # Perform Paillier sum on ciphertexts
     encrypted_values = await self._move(encrypted_values,
         tff.CLIENTS, paillier_placement.AGGREGATOR)
-    encrypted_sum = await self._compute_paillier_sum(
-        self.encryption_key_paillier, encrypted_values)
+    encrypted_sum = await self._compute_paillier_sum(encrypted_values)
     # Move to server and decrypt the result
     encrypted_sum = await self._move(encrypted_sum,
         paillier_placement.AGGREGATOR, tff.SERVER)
     decrypted_result = await self._compute_paillier_decryption(
-        self.decryption_key,
-        self.encryption_key_server,
+        self.key_pair_server,
         encrypted_sum,
         export_dtype=input_tensor_dtype)
+    if matrix_shape is None:
+      return decrypted_result
     return await self._compute_reshape_on_tensor(
         decrypted_result, output_shape=input_tensor_shape.as_list())
 
   async def _compute_paillier_encryption(self,
-      client_encryption_keys: federated_resolving_strategy.FederatedResolvingStrategyValue,
-      clients_value: federated_resolving_strategy.FederatedResolvingStrategyValue):
+      clients_value: federated_resolving_strategy.FederatedResolvingStrategyValue,
+      output_shape=None):
     client_children = self._get_child_executors(tff.CLIENTS)
     num_clients = len(client_children)
-    py_typecheck.check_len(client_encryption_keys.internal_representation,
-        num_clients)
-    py_typecheck.check_len(clients_value.internal_representation, num_clients)
-    encryptor_proto, encryptor_type = utils.lift_to_computation_spec(
-        self._paillier_encryptor,
-        input_arg_type=tff.StructType((
-            client_encryption_keys.type_signature.member,
-            clients_value.type_signature.member)))
-    encryptor_fns = asyncio.gather(*[
-        c.create_value(encryptor_proto, encryptor_type)
-        for c in client_children])
-    encryptor_args = asyncio.gather(*[c.create_struct((ek, v)) for c, ek, v in zip(
-        client_children,
-        client_encryption_keys.internal_representation,
-        clients_value.internal_representation)])
-    encryptor_fns, encryptor_args = await asyncio.gather(
-        encryptor_fns, encryptor_args)
-    encrypted_values = await asyncio.gather(*[
-      c.create_call(fn, arg) for c, fn, arg in zip(
-          client_children, encryptor_fns, encryptor_args)])
+    assert len(clients_value.internal_representation) == num_clients
+    encryptor_proto, encryptor_type = utils.materialize_computation_from_cache(
+        self._make_encryptor,
+        self._computation_cache,
+        arg_spec=(clients_value.type_signature.member,),
+        output_shape=output_shape)
+
+    async def encrypt_on_client(index, v):
+      encryptor_fn = await self._create_fn_value(
+          tff.CLIENTS, index, encryptor_proto, encryptor_type)
+      return await client_children[index].create_call(encryptor_fn, v)
+
+    encrypted_values = await utils.gather_or_cancel(*[
+        encrypt_on_client(i, v)
+        for i, v in enumerate(clients_value.internal_representation)])
     return federated_resolving_strategy.FederatedResolvingStrategyValue(encrypted_values,
         tff.FederatedType(encryptor_type.result, tff.CLIENTS,
             clients_value.type_signature.all_equal))
 
+  async def _create_fn_value(self, placement, index, fn_proto, fn_type):
+    """Creates a function value on a child executor, reusing it across rounds.
+
+    Function values are cached per child executor and function type, and the
+    cache is reset whenever a new encryption key is set up.
+    """
+    cache_key = (placement.uri, index, fn_type.compact_representation())
+    fn_value = self._fn_value_cache.get(cache_key)
+    if fn_value is None:
+      child = self._get_child_executors(placement, index=index)
+      fn_value = await child.create_value(fn_proto, fn_type)
+      self._fn_value_cache[cache_key] = fn_value
+    return fn_value
+
   async def _compute_paillier_sum(self,
-      encryption_key: federated_resolving_strategy.FederatedResolvingStrategyValue,
       values: federated_resolving_strategy.FederatedResolvingStrategyValue):
     paillier_child = self._get_child_executors(
         paillier_placement.AGGREGATOR, index=0)
-    sum_proto, sum_type = utils.lift_to_computation_spec(
-        self._paillier_sequence_sum,
-        input_arg_type=tff.StructType((
-            encryption_key.type_signature.member,
-            tff.StructType([vt.member for vt in values.type_signature]))))
-    sum_fn = paillier_child.create_value(sum_proto, sum_type)
-    sum_arg = paillier_child.create_struct((
-        encryption_key.internal_representation,
-        await paillier_child.create_struct(values.internal_representation)))
-    sum_fn, sum_arg = await asyncio.gather(sum_fn, sum_arg)
+    sum_proto, sum_type = utils.materialize_computation_from_cache(
+        self._make_sequence_sum,
+        self._computation_cache,
+        arg_spec=(tff.StructType([vt.member for vt in values.type_signature]),))
+    sum_fn, sum_arg = await asyncio.gather(
+        self._create_fn_value(
+            paillier_placement.AGGREGATOR, 0, sum_proto, sum_type),
+        paillier_child.create_struct(values.internal_representation))
     encrypted_sum = await paillier_child.create_call(sum_fn, sum_arg)
     return federated_resolving_strategy.FederatedResolvingStrategyValue(encrypted_sum,
         tff.FederatedType(sum_type.result, paillier_placement.AGGREGATOR, True))
 
   async def _compute_paillier_decryption(self,
-      decryption_key: federated_resolving_strategy.FederatedResolvingStrategyValue,
-      encryption_key: federated_resolving_strategy.FederatedResolvingStrategyValue,
+      key_pair: federated_resolving_strategy.FederatedResolvingStrategyValue,
       value: federated_resolving_strategy.FederatedResolvingStrategyValue,
       export_dtype):
     server_child = self._get_child_executors(tff.SERVER, index=0)
-    decryptor_arg_spec = (decryption_key.type_signature.member,
-        encryption_key.type_signature.member,
+    decryptor_arg_spec = (key_pair.type_signature.member,
         value.type_signature.member)
     decryptor_proto, decryptor_type = utils.materialize_computation_from_cache(
         paillier_comp.make_decryptor,
-        self._paillier_decryptor_cache,
+        self._computation_cache,
         arg_spec=decryptor_arg_spec,
         export_dtype=export_dtype)
     decryptor_fn = server_child.create_value(decryptor_proto, decryptor_type)
     decryptor_arg = server_child.create_struct((
-        decryption_key.internal_representation,
-        encryption_key.internal_representation,
+        key_pair.internal_representation[0],
         value.internal_representation))
     decryptor_fn, decryptor_arg = await asyncio.gather(decryptor_fn, decryptor_arg)
     decrypted_value = await server_child.create_call(decryptor_fn, decryptor_arg)
@@ -211,15 +229,14 @@ class PaillierAggregatingStrategy(tff.framework.FederatedResolvingStrategy):
 
   async def _compute_reshape_on_tensor(self, tensor, output_shape):
     tensor_type = tensor.type_signature.member
-    shape_type = type_conversions.infer_type(output_shape)
     reshaper_proto, reshaper_type = utils.materialize_computation_from_cache(
         paillier_comp.make_reshape_tensor,
-        self._reshape_function_cache,
+        self._computation_cache,
         arg_spec=(tensor_type,),
         output_shape=output_shape)
     tensor_placement = tensor.type_signature.placement
     children = self._get_child_executors(tensor_placement)
-    py_typecheck.check_len(tensor.internal_representation, len(children))
+    assert len(tensor.internal_representation) == len(children)
     reshaper_fns = await asyncio.gather(*[
         ex.create_value(reshaper_proto, reshaper_type) for ex in children])
     reshaped_tensors = await asyncio.gather(*[
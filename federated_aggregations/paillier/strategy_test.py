@@ -1,3 +1,4 @@
+import functools
 from unittest import mock
 
 from absl.testing import absltest
@@ -7,6 +8,7 @@ import tensorflow as tf
 import tensorflow_federated as tff
 from tensorflow_federated.python.core.impl.executors import execution_context
 
+from federated_aggregations.paillier import computations as paillier_comp
 from federated_aggregations.paillier import factory
 
 
@@ -16,6 +18,13 @@ def _install_executor(executor_factory_instance):
 
 
 def make_integer_secure_sum(input_shape):
+  if input_shape is not None:
+    input_shape = tuple(input_shape)
+  return _make_integer_secure_sum(input_shape)
+
+
+@functools.lru_cache(maxsize=None)
+def _make_integer_secure_sum(input_shape):
   if input_shape is None:
     member_type = tf.int32
   else:
@@ -28,14 +37,24 @@ def make_integer_secure_sum(input_shape):
 
 
 class PaillierAggregatingStrategyTest(parameterized.TestCase):
+  @classmethod
+  def setUpClass(cls):
+    super().setUpClass()
+    # Key generation dominates executor setup, so all cases share one key
+    # pair; factory_test still covers server-side key generation.
+    ek_raw, dk_raw = paillier_comp.make_keygen(modulus_bitlength=2048)()
+    cls._key_inputter = paillier_comp.make_key_inputter(ek_raw, dk_raw)
+
+  def _executor_factory(self, **kwargs):
+    return factory.local_paillier_executor_factory(
+        key_inputter=self._key_inputter, **kwargs)
+
   @parameterized.named_parameters(
-      ('paillier_executor_factory_none_clients',
-      factory.local_paillier_executor_factory()),
-      ('paillier_executor_factory_five_clients',
-      factory.local_paillier_executor_factory(num_clients=5)))
-  def test_federated_secure_sum_with(self, factory):
+      ('paillier_executor_factory_none_clients', None),
+      ('paillier_executor_factory_five_clients', 5))
+  def test_federated_secure_sum_with(self, num_clients):
     secure_paillier_addition = make_integer_secure_sum(None)
-    with _install_executor(factory):
+    with _install_executor(self._executor_factory(num_clients=num_clients)):
       result = secure_paillier_addition([1, 2, 3, 4, 5])
     self.assertAlmostEqual(result, 15.0)
 
@@ -46,7 +65,7 @@ class PaillierAggregatingStrategyTest(parameterized.TestCase):
     NUM_CLIENTS = 5
     expected = input_tensor * NUM_CLIENTS
     secure_paillier_addition = make_integer_secure_sum(input_shape)
-    with _install_executor(factory.local_paillier_executor_factory()):
+    with _install_executor(self._executor_factory()):
       result = secure_paillier_addition([input_tensor] * NUM_CLIENTS)
     np.testing.assert_almost_equal(result, expected)
 
@@ -54,7 +73,7 @@ class PaillierAggregatingStrategyTest(parameterized.TestCase):
       (('{}'.format(n), n) for n in [5, 20, 50]))
   def test_secure_sum_many_clients(self, num_clients):
     secure_paillier_addition = make_integer_secure_sum([1, 1])
-    with _install_executor(factory.local_paillier_executor_factory()):
+    with _install_executor(self._executor_factory()):
       result = secure_paillier_addition([[[1]]] * num_clients)
     self.assertAlmostEqual(result, num_clients)
 
@@ -64,12 +83,8 @@ class PaillierAggregatingStrategyTest(parameterized.TestCase):
     NUM_CLIENTS = 5
     shape = (first_dim, second_dim)
     input_tensor = np.ones(shape, dtype=np.int32)
-    member_type = tff.TensorType(tf.int32, shape)
-    @tff.federated_computation(tff.FederatedType(member_type, tff.CLIENTS))
-    def secure_paillier_addition(x):
-      return tff.federated_secure_sum(x, 64)
-
-    with _install_executor(factory.local_paillier_executor_factory()):
+    secure_paillier_addition = make_integer_secure_sum(shape)
+    with _install_executor(self._executor_factory()):
       result = secure_paillier_addition([input_tensor] * NUM_CLIENTS)
     expected = input_tensor * NUM_CLIENTS
     np.testing.assert_almost_equal(result, expected)
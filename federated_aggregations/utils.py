@@ -1,3 +1,4 @@
+import asyncio
 from typing import Tuple
 
 import tensorflow_federated as tff
@@ -12,7 +13,8 @@ def materialize_computation_from_cache(
   """
   
   hashable_arg_spec = tuple((
-        *(repr(arg) for _, arg in factory_kwargs.items()),
+        '{}.{}'.format(factory_func.__module__, factory_func.__qualname__),
+        *('{}={!r}'.format(k, v) for k, v in sorted(factory_kwargs.items())),
         *(x.compact_representation() for x in arg_spec)))
   fn_proto, fn_type = cache.get(hashable_arg_spec, (None, None))
   if fn_proto is None:
@@ -38,3 +40,28 @@ def lift_to_computation_spec(tf_func, input_arg_type=None):
                        'be made concrete.')
     tf_func = tf_func.fn_for_argument_type(input_arg_type)
   return tf_func._computation_proto, tf_func.type_signature
+
+
+async def gather_or_cancel(*aws):
+  """Like asyncio.gather, but cancels the remaining awaitables on failure.
+
+  Results are returned in the order of aws. The first exception raised by
+  any of them is propagated once the others have been cancelled. If this
+  coroutine is itself cancelled, the awaitables are cancelled too.
+  """
+  futures = [asyncio.ensure_future(aw) for aw in aws]
+  if not futures:
+    return []
+  try:
+    done, _ = await asyncio.wait(
+        futures, return_when=asyncio.FIRST_EXCEPTION)
+    for fut in futures:
+      if fut in done and not fut.cancelled() and fut.exception() is not None:
+        raise fut.exception()
+    return [fut.result() for fut in futures]
+  finally:
+    for fut in futures:
+      if not fut.done():
+        fut.cancel()
+    # Retrieves secondary exceptions too, so none are reported as unhandled.
+    await asyncio.gather(*futures, return_exceptions=True)